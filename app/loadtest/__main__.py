@@ -0,0 +1,99 @@
+# app/loadtest/__main__.py
+# 사용 예:
+#   python -m app.loadtest --concurrency 32 --duration 30 --llm-latency-ms 800 --llm-failure-rate 0.05
+#   python -m app.loadtest --max-loop-lag-p99-ms 20 --max-error-rate 0.01 --max-p95 analyze=100
+# budget 을 하나라도 넘으면 종료 코드 1
+import argparse, json, sys
+from app.loadtest.harness import DEFAULT_WEIGHTS, run_load_test, format_report
+
+def _parse_weights(items):
+    out = {}
+    for it in items or []:
+        k, _, v = it.partition("=")
+        try:
+            w = float(v)
+        except ValueError:
+            w = -1.0
+        if k not in DEFAULT_WEIGHTS or w < 0:
+            raise SystemExit(f"invalid --weight {it!r} (keys: {', '.join(DEFAULT_WEIGHTS)}, weight >= 0)")
+        out[k] = w
+    return out
+
+def _parse_p95(items):
+    out = {}
+    for it in items or []:
+        k, _, v = it.partition("=")
+        try:
+            ms = float(v)
+        except ValueError:
+            ms = -1.0
+        if k not in DEFAULT_WEIGHTS or ms < 0:
+            raise SystemExit(f"invalid --max-p95 {it!r} (keys: {', '.join(DEFAULT_WEIGHTS)}, ms >= 0)")
+        out[k] = ms
+    return out
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(prog="python -m app.loadtest",
+                                description="Oathkeeper 혼합 부하 테스트 (가짜 Ollama 포함)")
+    p.add_argument("--concurrency", type=int, default=16)
+    p.add_argument("--duration", type=float, default=10.0, help="seconds")
+    p.add_argument("--plans", type=int, default=5)
+    p.add_argument("--members", type=int, default=4)
+    p.add_argument("--burst", type=int, default=5, help="analyze 요청 묶음 크기")
+    p.add_argument("--weight", action="append", metavar="OP=W",
+                   help=f"workload weight, OP in {{{', '.join(DEFAULT_WEIGHTS)}}} (반복 가능)")
+    p.add_argument("--seed", type=int, default=None)
+    p.add_argument("--data-root", default=None, help="기본: 임시 디렉터리")
+    p.add_argument("--llm-latency-ms", type=float, default=200.0)
+    p.add_argument("--llm-jitter-ms", type=float, default=50.0)
+    p.add_argument("--llm-stream", choices=["auto", "on", "off"], default="auto",
+                   help="auto: 요청의 stream 값을 따름. on: NDJSON 강제 -> 앱 클라이언트는 "
+                        "stream=false + r.json() 이라 mode=llm 요청이 전부 실패함 (장애 주입 용도)")
+    p.add_argument("--llm-failure-rate", type=float, default=0.0)
+    p.add_argument("--llm-failure-status", type=int, default=500)
+    p.add_argument("--baseline", type=float, default=1.0,
+                   help="부하 전 유휴 lag 측정 시간(초), 측정 잡음 기준선")
+    p.add_argument("--max-loop-lag-p99-ms", type=float, default=None)
+    p.add_argument("--max-loop-lag-max-ms", type=float, default=None)
+    p.add_argument("--max-error-rate", type=float, default=None, help="0~1, 전체 요청 대비 4xx/5xx/예외 비율")
+    p.add_argument("--max-p95", action="append", metavar="OP=MS",
+                   help="라우트별 p95 상한(ms), OP 는 --weight 와 같음 (반복 가능)")
+    p.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    args = p.parse_args(argv)
+
+    ollama = {
+        "latency_ms": args.llm_latency_ms,
+        "jitter_ms": args.llm_jitter_ms,
+        "stream": {"auto": None, "on": True, "off": False}[args.llm_stream],
+        "failure_rate": args.llm_failure_rate,
+        "failure_status": args.llm_failure_status,
+        "seed": args.seed,
+    }
+    budgets = {
+        "loop_lag_p99_ms": args.max_loop_lag_p99_ms,
+        "loop_lag_max_ms": args.max_loop_lag_max_ms,
+        "error_rate": args.max_error_rate,
+        "route_p95_ms": _parse_p95(args.max_p95),
+    }
+    result = run_load_test(
+        concurrency=args.concurrency,
+        duration=args.duration,
+        plans=args.plans,
+        members=args.members,
+        burst=args.burst,
+        weights=_parse_weights(args.weight),
+        seed=args.seed,
+        ollama=ollama,
+        data_root=args.data_root,
+        baseline=args.baseline,
+        budgets=budgets,
+    )
+    if args.json:
+        json.dump(result, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    else:
+        print(format_report(result))
+    return 1 if result["breaches"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+# app/loadtest/app_server.py
+# 부하 테스트용으로 create_app()을 별도 프로세스에서 띄운다 (드라이버와 GIL을 공유하지 않도록).
+#   python -m app.loadtest.app_server --port 18001 --data-root /tmp/x --ollama-url http://127.0.0.1:18002
+# 내부 엔드포인트:
+#   GET  /__loadtest/stats  -> {"lag_samples": [초...], "exceptions": {"<route>: <예외>": 건수}}
+#   POST /__loadtest/reset  -> 위 수집값 초기화
+import argparse, asyncio, sys
+from typing import Dict, List, Optional
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+STATS_PATH = "/__loadtest/stats"
+RESET_PATH = "/__loadtest/reset"
+
+class LoopLagProbe:
+    """
+    앱 이벤트 루프 안에서 interval 마다 sleep 하고, 예정보다 늦게 깨어난 시간을 기록.
+    블로킹 호출이 루프를 붙잡으면 lag가 그만큼 튄다.
+    """
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            t0 = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - t0 - self.interval))
+
+    def install(self, app: FastAPI) -> None:
+        async def _start():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+        async def _stop():
+            if self._task:
+                self._task.cancel()
+
+        app.router.on_startup.append(_start)
+        app.router.on_shutdown.append(_stop)
+
+    def reset(self) -> None:
+        self.samples = []
+
+def instrument(app: FastAPI, lag_interval: float = 0.01) -> None:
+    """lag 프로브 + 미처리 예외 집계 미들웨어 + 내부 통계 엔드포인트를 붙인다."""
+    probe = LoopLagProbe(lag_interval)
+    probe.install(app)
+    exceptions: Dict[str, int] = {}
+
+    @app.middleware("http")
+    async def _count_exceptions(request: Request, call_next):
+        # 트레이스백을 stderr로 쏟는 대신 (라우트, 예외 타입)별로 세고 500만 돌려준다
+        try:
+            return await call_next(request)
+        except Exception as e:
+            route = request.scope.get("route")
+            where = f"{request.method} {getattr(route, 'path', request.url.path)}"
+            key = f"{where}: {type(e).__name__}"
+            exceptions[key] = exceptions.get(key, 0) + 1
+            return JSONResponse(status_code=500, content={"detail": "Internal Server Error"})
+
+    @app.get(STATS_PATH, include_in_schema=False)
+    async def _stats():
+        return {"lag_samples": probe.samples, "exceptions": exceptions}
+
+    @app.post(RESET_PATH, include_in_schema=False)
+    async def _reset():
+        probe.reset()
+        exceptions.clear()
+        return {"success": True}
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(prog="python -m app.loadtest.app_server")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, required=True)
+    p.add_argument("--data-root", required=True)
+    p.add_argument("--ollama-url", required=True)
+    p.add_argument("--lag-interval", type=float, default=0.01)
+    args = p.parse_args(argv)
+
+    import uvicorn
+    from app import storage
+    from app.services import llm_client, report_service
+    from app.main import create_app
+
+    # OLLAMA_URL / DATA_ROOT 는 모듈 전역이라 이 프로세스 안에서만 바꿔치기
+    storage.DATA_ROOT = args.data_root
+    llm_client.OLLAMA_URL = args.ollama_url
+    report_service.OLLAMA_URL = args.ollama_url
+
+    app = create_app()
+    instrument(app, args.lag_interval)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="critical", access_log=False)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+# app/loadtest/fake_ollama.py
+# 부하 테스트용 로컬 Ollama 대역(/api/generate 만 흉내냄)
+import asyncio, json, random
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+DEFAULT_TEXT = (
+    "약속 요약입니다. 전체 이동 거리와 소요 시간은 무난한 편이었습니다. "
+    "일부 멤버는 이동 시간이 조금 더 걸렸어요. 다음 약속도 여유 있게 출발해봐요!"
+)
+
+def create_fake_ollama(latency_ms: float = 200.0,
+                       jitter_ms: float = 50.0,
+                       stream: Optional[bool] = None,
+                       chunk_tokens: int = 4,
+                       failure_rate: float = 0.0,
+                       failure_status: int = 500,
+                       seed: Optional[int] = None,
+                       text: str = DEFAULT_TEXT) -> FastAPI:
+    """
+    latency_ms + U(0, jitter_ms) 만큼 지연 후 응답하는 가짜 Ollama 서버.
+    stream: None이면 요청 payload의 "stream"을 따르고, True/False면 강제.
+            앱 클라이언트는 stream=false 로 JSON 한 덩어리를 기대하므로 True 강제는 장애 주입용.
+    failure_rate: 0~1 확률로 failure_status 에러 응답.
+    """
+    rng = random.Random(seed)
+    app = FastAPI(title="Fake Ollama")
+    app.state.calls = 0
+    app.state.failures = 0
+
+    def _latency() -> float:
+        return max(0.0, latency_ms + rng.uniform(0, jitter_ms)) / 1000.0
+
+    def _chunk(model: str, piece: str, done: bool) -> str:
+        body: Dict[str, Any] = {
+            "model": model,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "response": piece,
+            "done": done,
+        }
+        return json.dumps(body, ensure_ascii=False) + "\n"
+
+    @app.post("/api/generate")
+    async def generate(request: Request):
+        app.state.calls += 1
+        try:
+            payload = await request.json()
+        except Exception:
+            payload = {}
+        model = payload.get("model", "llama3.1")
+        # 실제 Ollama는 stream 기본값이 True
+        do_stream = payload.get("stream", True) if stream is None else stream
+
+        if failure_rate > 0 and rng.random() < failure_rate:
+            app.state.failures += 1
+            await asyncio.sleep(_latency())
+            return JSONResponse(status_code=failure_status, content={"error": "injected failure"})
+
+        delay = _latency()
+        if not do_stream:
+            await asyncio.sleep(delay)
+            return {"model": model, "created_at": datetime.now(timezone.utc).isoformat(),
+                    "response": text, "done": True}
+
+        words = text.split(" ")
+        pieces = [" ".join(words[i:i + max(1, chunk_tokens)]) + " "
+                  for i in range(0, len(words), max(1, chunk_tokens))]
+        per_chunk = delay / max(1, len(pieces))
+
+        async def _gen():
+            for p in pieces:
+                await asyncio.sleep(per_chunk)
+                yield _chunk(model, p, False)
+            yield _chunk(model, "", True)
+
+        return StreamingResponse(_gen(), media_type="application/x-ndjson")
+
+    return app
@@ -0,0 +1,365 @@
+# app/loadtest/harness.py
+# 가짜 Ollama(스레드) + create_app()(별도 프로세스)를 띄우고 혼합 부하를 건다.
+# 앱을 별도 프로세스로 돌려야 드라이버의 CPU/GIL 점유가 앱 이벤트 루프 lag 측정에 섞이지 않는다.
+import asyncio, math, random, socket, subprocess, sys, tempfile, threading, time
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Iterator
+
+import httpx
+import uvicorn
+
+from app.loadtest.app_server import RESET_PATH, STATS_PATH
+from app.loadtest.fake_ollama import create_fake_ollama
+
+# op 이름 -> 가중치 기본값
+DEFAULT_WEIGHTS: Dict[str, float] = {
+    "analyze": 0.5,      # POST /metrics/analyze (burst 단위)
+    # 기존 버그로 항상 500: report.py 가 compute_summary 를 모듈 하단에서 재정의하고,
+    # 그 요약의 datetime 을 save_summary 가 json.dump 하지 못함. 고쳐지기 전까지 기본 0.
+    "report": 0.0,       # GET  /metrics/report/{plan_id}
+    "report_text": 0.15, # GET  /metrics/report/{plan_id}/text
+    "llm_text": 0.15,    # POST /metrics/report/{plan_id}/text (mode=llm)
+    "timeseries": 0.1,   # GET  /metrics/report/{plan_id}/timeseries
+}
+
+# op 이름 -> 결과의 라우트 라벨
+ROUTES: Dict[str, str] = {
+    "analyze": "POST /metrics/analyze",
+    "report": "GET /metrics/report/{plan_id}",
+    "report_text": "GET /metrics/report/{plan_id}/text",
+    "llm_text": "POST /metrics/report/{plan_id}/text [llm]",
+    "timeseries": "GET /metrics/report/{plan_id}/timeseries",
+}
+
+# ---------- 통계 유틸 ----------
+def _percentile(sorted_vals: List[float], q: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    # nearest-rank
+    k = max(0, min(len(sorted_vals) - 1, math.ceil(q / 100.0 * len(sorted_vals)) - 1))
+    return sorted_vals[k]
+
+def _dist_ms(samples: List[float]) -> Dict[str, float]:
+    vals = sorted(s * 1000.0 for s in samples)
+    return {
+        "p50_ms": round(_percentile(vals, 50), 2),
+        "p95_ms": round(_percentile(vals, 95), 2),
+        "p99_ms": round(_percentile(vals, 99), 2),
+        "max_ms": round(vals[-1], 2) if vals else 0.0,
+    }
+
+# ---------- 서버 실행 ----------
+def _free_port(host: str) -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind((host, 0))
+        return s.getsockname()[1]
+
+class _ServerThread:
+    def __init__(self, app, host: str, port: int):
+        self.url = f"http://{host}:{port}"
+        config = uvicorn.Config(app, host=host, port=port, log_level="critical",
+                                access_log=False, lifespan="on")
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def start(self, timeout: float = 10.0) -> None:
+        self.thread.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if not self.thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError(f"server failed to start: {self.url}")
+            time.sleep(0.01)
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+        self.thread.join(timeout=10.0)
+
+class _AppProcess:
+    """app.loadtest.app_server 를 자식 프로세스로 실행. 출력은 임시 파일로 모아 기동 실패 때만 보여준다."""
+    def __init__(self, host: str, port: int, data_root: str, ollama_url: str, lag_interval: float):
+        from app.storage import PROJECT_ROOT
+        self.url = f"http://{host}:{port}"
+        self._log = tempfile.TemporaryFile()
+        self._cmd = [sys.executable, "-m", "app.loadtest.app_server",
+                     "--host", host, "--port", str(port), "--data-root", data_root,
+                     "--ollama-url", ollama_url, "--lag-interval", str(lag_interval)]
+        self._cwd = PROJECT_ROOT
+        self.proc: Optional[subprocess.Popen] = None
+
+    def _output_tail(self, n: int = 2000) -> str:
+        self._log.seek(0)
+        return self._log.read().decode("utf-8", "replace")[-n:]
+
+    def start(self, timeout: float = 30.0) -> None:
+        self.proc = subprocess.Popen(self._cmd, cwd=self._cwd, stdout=self._log, stderr=subprocess.STDOUT)
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.proc.poll() is not None:
+                raise RuntimeError(f"app server exited ({self.proc.returncode}):\n{self._output_tail()}")
+            try:
+                if httpx.get(self.url + STATS_PATH, timeout=1.0).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"app server failed to start: {self.url}\n{self._output_tail()}")
+            time.sleep(0.05)
+
+    def stats(self) -> Dict[str, Any]:
+        r = httpx.get(self.url + STATS_PATH, timeout=10.0)
+        r.raise_for_status()
+        return r.json()
+
+    def reset(self) -> None:
+        httpx.post(self.url + RESET_PATH, timeout=10.0).raise_for_status()
+
+    def stop(self) -> None:
+        if self.proc and self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=10.0)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+                self.proc.wait()
+        self._log.close()
+
+@contextmanager
+def running_stack(host: str = "127.0.0.1",
+                  data_root: Optional[str] = None,
+                  ollama: Optional[Dict[str, Any]] = None,
+                  lag_interval: float = 0.01) -> Iterator[Dict[str, Any]]:
+    """
+    가짜 Ollama 는 이 프로세스의 스레드로, 본 앱은 자식 프로세스로 띄운다.
+    DATA_ROOT / OLLAMA_URL 바꿔치기는 자식 프로세스(app_server) 안에서만 일어난다.
+    """
+    fake = create_fake_ollama(**(ollama or {}))
+    fake_srv = _ServerThread(fake, host, _free_port(host))
+
+    tmp = None
+    if data_root is None:
+        tmp = tempfile.TemporaryDirectory(prefix="oathkeeper_loadtest_")
+        data_root = tmp.name
+
+    app_proc = _AppProcess(host, _free_port(host), data_root, fake_srv.url, lag_interval)
+    try:
+        fake_srv.start()
+        app_proc.start()
+        yield {"app_url": app_proc.url, "ollama_url": fake_srv.url,
+               "app": app_proc, "fake_app": fake, "data_root": data_root}
+    finally:
+        app_proc.stop()
+        fake_srv.stop()
+        if tmp is not None:
+            tmp.cleanup()
+
+# ---------- 부하 드라이버 ----------
+def _metrics_payload(rng: random.Random, plan_id: int, members: int) -> Dict[str, Any]:
+    return {
+        "plan_id": plan_id,
+        "member_id": rng.randint(1, members),
+        "distance_km": round(rng.uniform(0.5, 30.0), 2),
+        "travel_minutes": rng.randint(5, 120),
+        "late_minutes": rng.choice([None, 0, rng.randint(1, 30)]),
+        "wait_minutes": rng.choice([None, 0, rng.randint(1, 20)]),
+    }
+
+class _Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.status: Dict[str, Dict[str, int]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def add(self, route: str, elapsed: float, status: Optional[int]) -> None:
+        self.latencies.setdefault(route, []).append(elapsed)
+        codes = self.status.setdefault(route, {})
+        key = str(status) if status is not None else "exc"
+        codes[key] = codes.get(key, 0) + 1
+        if status is None or status >= 400:
+            self.errors[route] = self.errors.get(route, 0) + 1
+
+async def _timed(client: httpx.AsyncClient, rec: _Recorder, route: str,
+                 method: str, url: str, **kwargs) -> None:
+    t0 = time.perf_counter()
+    status: Optional[int] = None
+    try:
+        r = await client.request(method, url, **kwargs)
+        status = r.status_code
+    except httpx.HTTPError:
+        pass
+    rec.add(route, time.perf_counter() - t0, status)
+
+async def _drive(app_url: str,
+                 concurrency: int,
+                 duration: float,
+                 plans: int,
+                 members: int,
+                 burst: int,
+                 weights: Dict[str, float],
+                 seed: Optional[int],
+                 timeout: float) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    rec = _Recorder()
+    ops = [k for k, w in weights.items() if w > 0]
+    ws = [weights[k] for k in ops]
+    if not ops:
+        raise ValueError("at least one workload weight must be > 0")
+
+    limits = httpx.Limits(max_connections=concurrency * max(1, burst), max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=app_url, timeout=timeout, limits=limits) as client:
+
+        async def one(op: str) -> None:
+            pid = rng.randint(1, plans)
+            if op == "analyze":
+                await asyncio.gather(*[
+                    _timed(client, rec, ROUTES["analyze"], "POST", "/metrics/analyze",
+                           json=_metrics_payload(rng, pid, members))
+                    for _ in range(burst)
+                ])
+            elif op == "report":
+                await _timed(client, rec, ROUTES["report"], "GET", f"/metrics/report/{pid}")
+            elif op == "report_text":
+                await _timed(client, rec, ROUTES["report_text"], "GET", f"/metrics/report/{pid}/text")
+            elif op == "timeseries":
+                await _timed(client, rec, ROUTES["timeseries"], "GET",
+                             f"/metrics/report/{pid}/timeseries",
+                             params={"bucket": rng.choice(["minute", "hour", "day"])})
+            elif op == "llm_text":
+                await _timed(client, rec, ROUTES["llm_text"], "POST",
+                             f"/metrics/report/{pid}/text", json={"mode": "llm"})
+
+        async def worker(deadline: float) -> None:
+            while time.perf_counter() < deadline:
+                await one(rng.choices(ops, weights=ws)[0])
+
+        t_start = time.perf_counter()
+        deadline = t_start + duration
+        await asyncio.gather(*[worker(deadline) for _ in range(concurrency)])
+        elapsed = time.perf_counter() - t_start
+
+    routes: Dict[str, Any] = {}
+    for route, samples in sorted(rec.latencies.items()):
+        routes[route] = {
+            "requests": len(samples),
+            "errors": rec.errors.get(route, 0),
+            "status": rec.status.get(route, {}),
+            "rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+            **_dist_ms(samples),
+        }
+    total = sum(len(v) for v in rec.latencies.values())
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "total_requests": total,
+        "total_errors": sum(rec.errors.values()),
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "routes": routes,
+    }
+
+async def _seed(app_url: str, plans: int, members: int, timeout: float) -> None:
+    # report 계열이 404/409로 빠지지 않게 플랜마다 멤버 수만큼 기록을 미리 넣어둔다
+    rng = random.Random(0)
+    async with httpx.AsyncClient(base_url=app_url, timeout=timeout) as client:
+        for pid in range(1, plans + 1):
+            for mid in range(1, members + 1):
+                p = _metrics_payload(rng, pid, members)
+                p["member_id"] = mid
+                r = await client.post("/metrics/analyze", json=p)
+                r.raise_for_status()
+
+def check_budgets(result: Dict[str, Any], budgets: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    budgets: {"loop_lag_p99_ms", "loop_lag_max_ms", "error_rate", "route_p95_ms": {op: ms}} (모두 선택)
+    초과한 항목 목록을 돌려준다. 비어 있으면 통과.
+    """
+    breaches: List[Dict[str, Any]] = []
+
+    def over(name: str, limit, actual) -> None:
+        if limit is not None and actual > limit:
+            breaches.append({"budget": name, "limit": limit, "actual": actual})
+
+    lag = result["event_loop_lag"]
+    over("loop_lag_p99_ms", budgets.get("loop_lag_p99_ms"), lag["p99_ms"])
+    over("loop_lag_max_ms", budgets.get("loop_lag_max_ms"), lag["max_ms"])
+    total = result["total_requests"]
+    over("error_rate", budgets.get("error_rate"),
+         round(result["total_errors"] / total, 4) if total else 0.0)
+    for op, limit in (budgets.get("route_p95_ms") or {}).items():
+        route = result["routes"].get(ROUTES[op])
+        if route is not None:
+            over(f"p95_ms[{op}]", limit, route["p95_ms"])
+    return breaches
+
+def run_load_test(concurrency: int = 16,
+                  duration: float = 10.0,
+                  plans: int = 5,
+                  members: int = 4,
+                  burst: int = 5,
+                  weights: Optional[Dict[str, float]] = None,
+                  seed: Optional[int] = None,
+                  timeout: float = 120.0,
+                  ollama: Optional[Dict[str, Any]] = None,
+                  data_root: Optional[str] = None,
+                  lag_interval: float = 0.01,
+                  baseline: float = 1.0,
+                  budgets: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    혼합 부하(analyze burst / report 폴링 / mode=llm 텍스트)를 duration 초 동안 건다.
+    부하 전 baseline 초 동안 유휴 상태 lag 를 재서 측정 잡음의 기준선으로 함께 보고한다.
+    반환: 전체 처리량, 라우트별 상태 코드/p50/p95/p99, 앱 이벤트 루프 lag 분포(기준선 포함),
+    앱의 미처리 예외 집계, 가짜 Ollama 호출 수, budgets 초과 목록(breaches).
+    """
+    w = dict(DEFAULT_WEIGHTS)
+    if weights:
+        w.update(weights)
+
+    with running_stack(data_root=data_root, ollama=ollama, lag_interval=lag_interval) as stack:
+        app: _AppProcess = stack["app"]
+        asyncio.run(_seed(stack["app_url"], plans, members, timeout))
+        app.reset()
+        time.sleep(baseline)
+        idle_lag = app.stats()["lag_samples"]
+        app.reset()
+        fake = stack["fake_app"]
+        calls0, failures0 = fake.state.calls, fake.state.failures
+        result = asyncio.run(_drive(stack["app_url"], concurrency, duration, plans,
+                                    members, burst, w, seed, timeout))
+        stats = app.stats()
+        lag = stats["lag_samples"]
+        result["event_loop_lag"] = {"samples": len(lag), **_dist_ms(lag)}
+        result["baseline_loop_lag"] = {"samples": len(idle_lag), **_dist_ms(idle_lag)}
+        result["exceptions"] = stats["exceptions"]
+        result["ollama"] = {"calls": fake.state.calls - calls0,
+                            "injected_failures": fake.state.failures - failures0}
+
+    result["breaches"] = check_budgets(result, budgets or {})
+    result["config"] = {"concurrency": concurrency, "duration_s": duration, "plans": plans,
+                        "members": members, "burst": burst, "weights": w, "ollama": ollama or {},
+                        "baseline_s": baseline, "budgets": budgets or {}}
+    return result
+
+def format_report(result: Dict[str, Any]) -> str:
+    lines = [
+        f"elapsed {result['elapsed_s']}s, {result['total_requests']} req "
+        f"({result['total_errors']} err), {result['throughput_rps']} req/s",
+        "",
+        f"{'route':<45} {'req':>6} {'err':>5} {'rps':>8} {'p50':>9} {'p95':>9} {'p99':>9}  status",
+    ]
+    for route, s in result["routes"].items():
+        codes = " ".join(f"{k}:{v}" for k, v in sorted(s["status"].items()))
+        lines.append(f"{route:<45} {s['requests']:>6} {s['errors']:>5} {s['rps']:>8} "
+                     f"{s['p50_ms']:>9} {s['p95_ms']:>9} {s['p99_ms']:>9}  {codes}")
+    lines.append("")
+    for title, key in (("event loop lag", "event_loop_lag"), ("idle baseline ", "baseline_loop_lag")):
+        lag = result[key]
+        lines.append(f"{title} (ms): p50 {lag['p50_ms']}  p95 {lag['p95_ms']}  "
+                     f"p99 {lag['p99_ms']}  max {lag['max_ms']}  ({lag['samples']} samples)")
+    lines.append(f"fake ollama: {result['ollama']['calls']} calls, "
+                 f"{result['ollama']['injected_failures']} injected failures")
+    if result["exceptions"]:
+        lines.append("app exceptions:")
+        for k, v in sorted(result["exceptions"].items()):
+            lines.append(f"  {k}  x{v}")
+    if result["breaches"]:
+        lines.append("BUDGET EXCEEDED:")
+        for b in result["breaches"]:
+            lines.append(f"  {b['budget']}: {b['actual']} > {b['limit']}")
+    return "\n".join(lines)
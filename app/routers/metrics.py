@@ -7,8 +7,9 @@ from app.services.report_service import compute_summary, summary_to_text
 
 router = APIRouter(tags=["metrics"])
 
+# 파일 append + 롤업 갱신이 블로킹 I/O라 sync def (스레드풀에서 실행)
 @router.post("/analyze")
-async def analyze_metrics(payload: MetricsPayload) -> Dict[str, Any]:
+def analyze_metrics(payload: MetricsPayload) -> Dict[str, Any]:
     rec = payload.model_dump(mode="json")
     plan_id = rec["plan_id"]
 
@@ -1,9 +1,12 @@
 # app/routers/report.py
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel, Field
 from pydantic.config import ConfigDict
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Literal
+from datetime import datetime
+from app.storage import has_plan_dir
 from app.services.report_service import compute_summary, save_summary, summary_to_text
+from app.services.timeseries_service import compute_timeseries
 
 router = APIRouter()
 
@@ -56,6 +59,29 @@ async def get_report_text_prompted(plan_id: int, opts: TextOptions):
     )
     return {"success": True, "data": {"plan_id": plan_id, "mode": opts.mode, "text": txt}}
 
+# 롤업 파일 I/O가 있어 sync def (스레드풀에서 실행)
+@router.get("/report/{plan_id}/timeseries")
+def get_report_timeseries(plan_id: int,
+                          bucket: Literal["minute", "hour", "day"] = "hour",
+                          since: Optional[datetime] = None,
+                          until: Optional[datetime] = None,
+                          member_id: Optional[int] = None,
+                          tz_offset_minutes: int = Query(0, ge=-720, le=840, multiple_of=60)):
+    """
+    플랜(또는 멤버)별 시간 버킷 시계열. 버킷 경계는 기본 UTC이며,
+    tz_offset_minutes(정시 단위, KST=540)를 주면 해당 로컬 시간 기준으로 나눈다.
+    """
+    if plan_id <= 0 or not has_plan_dir(plan_id):
+        raise HTTPException(status_code=404, detail={"code": "PLAN_NOT_FOUND", "message": "Plan not found."})
+
+    series = compute_timeseries(plan_id, bucket=bucket, since=since, until=until,
+                                member_id=member_id, tz_offset_minutes=tz_offset_minutes)
+    # 플랜 전체든 멤버든 기록이 하나도 없으면 동일하게 409.
+    # created_at 을 못 읽어 빠진 기록만 있는 경우는 200 + skipped_records 로 알려준다.
+    if series["all_time_records"] == 0 and series["skipped_records"] == 0:
+        raise HTTPException(status_code=409, detail={"code": "NOT_READY", "message": "Plan not finished or no metrics yet."})
+    return {"success": True, "data": series}
+
 def compute_summary(plan_id: int) -> Dict[str, Any]:
     from app.storage import iter_metrics
     from collections import defaultdict
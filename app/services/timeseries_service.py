@@ -0,0 +1,119 @@
+# app/services/timeseries_service.py
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from app.storage import (ROLLUP_FIELDS, ROLLUP_PLAN_KEY, bucket_start, partition_key,
+                         partition_start, read_rollup_partition, rollup_partitions,
+                         sync_rollups, to_utc)
+
+_BUCKET_LEN = {"minute": timedelta(minutes=1), "hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+def _add_before(plan_id: int, bucket: str, parts: List[str], stop: datetime, key: str, cum: List[float]) -> None:
+    for part in parts:
+        if partition_start(part, bucket) >= stop:
+            break
+        for ts, slot in read_rollup_partition(plan_id, bucket, part).items():
+            vals = slot.get(key)
+            if vals is not None and datetime.fromisoformat(ts) < stop:
+                for i, v in enumerate(vals):
+                    cum[i] += v
+
+def _carry_before(plan_id: int, start: datetime, key: str) -> List[float]:
+    # start(시 단위 정렬) 이전 누적값: 전날까지는 day 롤업, 당일 start 전까지는 hour 롤업
+    # -> 앞쪽 minute 파티션은 읽지 않음
+    cum = [0] * len(ROLLUP_FIELDS)
+    day0 = bucket_start(start, "day")
+    _add_before(plan_id, "day", rollup_partitions(plan_id, "day"), day0, key, cum)
+    _add_before(plan_id, "hour", [partition_key(day0, "hour")], start, key, cum)
+    return cum
+
+def _local_floor(dt: datetime, bucket: str, offset: timedelta) -> datetime:
+    # 로컬(UTC+offset) 버킷 시작을 UTC 시각으로
+    return bucket_start(to_utc(dt) + offset, bucket) - offset
+
+def _grouped(plan_id: int, src: str, parts: List[str], bucket: str, offset: timedelta,
+             key: str) -> Iterator[Tuple[datetime, List[float]]]:
+    # src 롤업 버킷을 시간순으로 읽어 로컬 bucket 단위로 합친다 (src == bucket 이면 그대로)
+    cur: Optional[datetime] = None
+    acc: List[float] = []
+    for part in parts:
+        buckets = read_rollup_partition(plan_id, src, part)
+        # ISO(UTC, 고정 포맷) 문자열이라 사전순 정렬 == 시간순 정렬
+        for ts in sorted(buckets):
+            vals = buckets[ts].get(key)
+            if vals is None:
+                continue
+            g = _local_floor(datetime.fromisoformat(ts), bucket, offset)
+            if g != cur:
+                if cur is not None:
+                    yield cur, acc
+                cur, acc = g, [0] * len(ROLLUP_FIELDS)
+            for i, v in enumerate(vals):
+                acc[i] += v
+    if cur is not None:
+        yield cur, acc
+
+def compute_timeseries(plan_id: int,
+                       bucket: str = "hour",
+                       since: Optional[datetime] = None,
+                       until: Optional[datetime] = None,
+                       member_id: Optional[int] = None,
+                       tz_offset_minutes: int = 0) -> Dict[str, Any]:
+    """
+    롤업 파티션만 읽어 차트용 시계열을 만든다 (원본 기록은 읽지 않음 -> O(버킷 수)).
+    - 버킷 경계는 UTC 기준. tz_offset_minutes(정시 단위, 예: KST=540)를 주면 로컬 기준으로
+      나누고 t/since/until 도 그 오프셋으로 표기 (day 버킷은 hour 롤업을 다시 묶어 계산)
+    - member_id 없으면 플랜 전체, 있으면 해당 멤버만
+    - since/until: 버킷 시작 시각 기준 필터 (since가 속한 버킷부터, until 이하)
+    - total_records 는 범위 안 기록 수, all_time_records 는 범위와 무관한 전체 기록 수
+    - cum_* 는 범위 이전 버킷까지 포함한 누적값
+    - skipped_records: created_at 을 해석하지 못해 롤업에서 빠진 기록 수
+    """
+    if tz_offset_minutes % 60:
+        raise ValueError("tz_offset_minutes must be a whole number of hours")
+    offset = timedelta(minutes=tz_offset_minutes)
+    tz = timezone(offset)
+    state = sync_rollups(plan_id)
+    key = ROLLUP_PLAN_KEY if member_id is None else str(member_id)
+    src = "hour" if bucket == "day" and tz_offset_minutes else bucket
+    lo = _local_floor(since, bucket, offset) if since else None
+    hi = to_utc(until) if until else None
+    # until 이 속한 로컬 버킷의 끝까지 읽어야 함 (로컬 day 는 UTC 파티션 두 개에 걸칠 수 있음)
+    hi_end = _local_floor(hi, bucket, offset) + _BUCKET_LEN[bucket] - timedelta(microseconds=1) if hi else None
+
+    parts = [p for p in rollup_partitions(plan_id, src)
+             if (lo is None or p >= partition_key(lo, src))
+             and (hi_end is None or p <= partition_key(hi_end, src))]
+    if lo and parts:
+        cum = _carry_before(plan_id, partition_start(parts[0], src), key)
+    else:
+        cum = [0] * len(ROLLUP_FIELDS)
+
+    in_range = 0
+    points: List[Dict[str, Any]] = []
+    for t, vals in _grouped(plan_id, src, parts, bucket, offset, key):
+        if hi and t > hi:
+            break
+        for i, v in enumerate(vals):
+            cum[i] += v
+        if lo and t < lo:
+            continue
+        in_range += int(vals[0])
+        p: Dict[str, Any] = {"t": t.astimezone(tz).isoformat()}
+        for i, f in enumerate(ROLLUP_FIELDS):
+            p[f] = round(vals[i], 2) if f == "distance_km" else int(vals[i])
+        for i, f in enumerate(ROLLUP_FIELDS):
+            p[f"cum_{f}"] = round(cum[i], 2) if f == "distance_km" else int(cum[i])
+        points.append(p)
+
+    return {
+        "plan_id": plan_id,
+        "bucket": bucket,
+        "member_id": member_id,
+        "tz_offset_minutes": tz_offset_minutes,
+        "since": lo.astimezone(tz).isoformat() if lo else None,
+        "until": hi.astimezone(tz).isoformat() if hi else None,
+        "total_records": in_range,
+        "all_time_records": int(state["records"].get(key, 0)),
+        "skipped_records": int(state["skipped"].get(key, 0)),
+        "points": points,
+    }
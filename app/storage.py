@@ -1,5 +1,5 @@
 # app/storage.py
-import os, json
+import os, json, shutil, threading
 from typing import Iterator, Dict, Any, Optional
 from datetime import datetime, timezone
 
@@ -14,6 +14,15 @@ def _plan_dir(plan_id: int) -> str:
 def _metrics_path(plan_id: int) -> str:
     return os.path.join(_plan_dir(plan_id), "metrics.jsonl")
 
+def _rollup_dir(plan_id: int) -> str:
+    return os.path.join(_plan_dir(plan_id), "rollup")
+
+def _rollup_state_path(plan_id: int) -> str:
+    return os.path.join(_rollup_dir(plan_id), "state.json")
+
+def _rollup_part_path(plan_id: int, bucket: str, part: str) -> str:
+    return os.path.join(_rollup_dir(plan_id), bucket, f"{part}.json")
+
 # (호환용) 외부에서 쓰던 이름이 있으면 같이 제공
 def metrics_file_path(plan_id: int) -> str:
     return _metrics_path(plan_id)
@@ -47,14 +56,17 @@ def append_metrics_line(plan_id: int, rec: Dict[str, Any]) -> None:
     플랜별 jsonl에 1줄씩 추가 저장.
     - datetime은 ISO8601로 직렬화
     - created_at 없으면 현재(UTC)로 보강
+    - 같은 플랜 롤업도 이어서 갱신 (블로킹 I/O라 이벤트 루프 밖에서 호출할 것)
     """
     ensure_plan_dir(plan_id)
     if not rec.get("created_at"):
         rec["created_at"] = datetime.now(timezone.utc)
 
     path = _metrics_path(plan_id)
-    with open(path, "a", encoding="utf-8") as f:
-        f.write(json.dumps(rec, ensure_ascii=False, default=_default_serializer) + "\n")
+    with _plan_lock(plan_id):
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec, ensure_ascii=False, default=_default_serializer) + "\n")
+        _sync_rollups_locked(plan_id)
 
 def iter_metrics(plan_id: int) -> Iterator[Dict[str, Any]]:
     """
@@ -74,3 +86,197 @@ def iter_metrics(plan_id: int) -> Iterator[Dict[str, Any]]:
             except Exception:
                 # 잘못된 라인은 스킵
                 continue
+
+# ---------- 시간 버킷 롤업 ----------
+# metrics.jsonl 옆 rollup/ 디렉터리에 파티션 단위로 저장 (append 1건 = 작은 파티션 파일 3개 + state만 갱신)
+#   rollup/minute/YYYY-MM-DDTHH.json (≤60 버킷), rollup/hour/YYYY-MM-DD.json (≤24), rollup/day/YYYY-MM.json (≤31)
+#   파티션: {"offset": <반영된 마지막 라인의 끝 바이트>, "buckets": {"<버킷 시작 ISO>": {"_": [...], "<member_id>": [...]}}}
+#   rollup/state.json: {"offset": <로그에서 반영 완료된 바이트>, "records": {키: 건수}, "skipped": {키: created_at 파싱 실패 건수}}
+# "_" 는 플랜 전체 합계, 값 배열 순서는 ROLLUP_FIELDS. 버킷 경계는 모두 UTC.
+# state.offset 이 로그 크기와 다르면 그 뒤 라인만 재생하고, 파티션별 offset 으로 중복 반영을 막는다.
+# 파티션 파일이 있는데 읽을 수 없으면 그 이력은 복구할 수 없으므로 전체 재구성.
+ROLLUP_BUCKETS = ("minute", "hour", "day")
+ROLLUP_FIELDS = ("records", "distance_km", "travel_minutes", "late_minutes", "wait_minutes")
+ROLLUP_PLAN_KEY = "_"
+_ROLLUP_VERSION = 2
+_PART_FORMATS = {"minute": "%Y-%m-%dT%H", "hour": "%Y-%m-%d", "day": "%Y-%m"}
+
+_locks_guard = threading.Lock()
+_plan_locks: Dict[int, threading.Lock] = {}
+
+def _plan_lock(plan_id: int) -> threading.Lock:
+    with _locks_guard:
+        return _plan_locks.setdefault(plan_id, threading.Lock())
+
+def to_utc(v) -> Optional[datetime]:
+    dt = v if isinstance(v, datetime) else parse_dt(v if isinstance(v, str) else None)
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+def bucket_start(dt: datetime, bucket: str) -> datetime:
+    dt = to_utc(dt)
+    if bucket == "minute":
+        return dt.replace(second=0, microsecond=0)
+    if bucket == "hour":
+        return dt.replace(minute=0, second=0, microsecond=0)
+    if bucket == "day":
+        return dt.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"unknown bucket: {bucket}")
+
+def partition_key(dt: datetime, bucket: str) -> str:
+    return to_utc(dt).strftime(_PART_FORMATS[bucket])
+
+def partition_start(part: str, bucket: str) -> datetime:
+    return datetime.strptime(part, _PART_FORMATS[bucket]).replace(tzinfo=timezone.utc)
+
+def _rollup_values(rec: Dict[str, Any]) -> list:
+    def num(k, cast):
+        try:
+            return cast(rec.get(k) or 0)
+        except (TypeError, ValueError):
+            return cast(0)
+    return [1, num("distance_km", float), num("travel_minutes", int),
+            num("late_minutes", int), num("wait_minutes", int)]
+
+def _rollup_keys(rec: Dict[str, Any]) -> list:
+    keys = [ROLLUP_PLAN_KEY]
+    if rec.get("member_id") is not None:
+        keys.append(str(rec["member_id"]))
+    return keys
+
+def _read_json(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+def _write_json(path: str, obj: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+class _CorruptRollup(Exception):
+    pass
+
+def _empty_state() -> Dict[str, Any]:
+    return {"version": _ROLLUP_VERSION, "fields": list(ROLLUP_FIELDS),
+            "offset": 0, "records": {}, "skipped": {}}
+
+def _valid_partition(data) -> bool:
+    return (isinstance(data, dict) and isinstance(data.get("offset"), int)
+            and isinstance(data.get("buckets"), dict))
+
+def _load_partition(path: str) -> Dict[str, Any]:
+    # 없음 -> 새 파티션, 있는데 못 읽음 -> _CorruptRollup (빈 파티션으로 덮어쓰면 이력이 사라짐)
+    if not os.path.exists(path):
+        return {"offset": 0, "buckets": {}}
+    data = _read_json(path)
+    if not _valid_partition(data):
+        raise _CorruptRollup(path)
+    return data
+
+def _replay(plan_id: int, state: Dict[str, Any], size: int) -> Dict[str, Any]:
+    if state["offset"] == size:
+        return state
+
+    with open(_metrics_path(plan_id), "rb") as f:
+        f.seek(state["offset"])
+        data = f.read(size - state["offset"])
+    # 끝이 개행이 아닌(쓰는 중인) 마지막 라인은 다음 sync 때 반영
+    data = data[:data.rfind(b"\n") + 1]
+
+    parts: Dict[tuple, Dict[str, Any]] = {}
+    pos = state["offset"]
+    for raw in data.splitlines(keepends=True):
+        pos += len(raw)
+        try:
+            rec = json.loads(raw.decode("utf-8"))
+        except Exception:
+            continue  # iter_metrics 와 동일하게 잘못된 라인은 스킵
+        if not isinstance(rec, dict):
+            continue
+        keys = _rollup_keys(rec)
+        dt = to_utc(rec.get("created_at"))
+        if dt is None:
+            for k in keys:
+                state["skipped"][k] = state["skipped"].get(k, 0) + 1
+            continue
+        vals = _rollup_values(rec)
+        for k in keys:
+            state["records"][k] = state["records"].get(k, 0) + 1
+        for b in ROLLUP_BUCKETS:
+            pk = (b, partition_key(dt, b))
+            part = parts.get(pk)
+            if part is None:
+                part = parts[pk] = _load_partition(_rollup_part_path(plan_id, *pk))
+            if part["offset"] >= pos:
+                continue  # 이전 sync가 state 기록 전에 중단된 경우 이미 반영됨
+            slot = part["buckets"].setdefault(bucket_start(dt, b).isoformat(), {})
+            for k in keys:
+                acc = slot.setdefault(k, [0, 0.0, 0, 0, 0])
+                for i, v in enumerate(vals):
+                    acc[i] += v
+                acc[1] = round(acc[1], 6)
+            part["offset"] = pos
+
+    for (b, p), part in parts.items():
+        _write_json(_rollup_part_path(plan_id, b, p), part)
+    state["offset"] = pos
+    _write_json(_rollup_state_path(plan_id), state)
+    return state
+
+def _sync_rollups_locked(plan_id: int) -> Dict[str, Any]:
+    log_path = _metrics_path(plan_id)
+    size = os.path.getsize(log_path) if os.path.exists(log_path) else 0
+    state = _read_json(_rollup_state_path(plan_id))
+    if not state or state.get("version") != _ROLLUP_VERSION or state.get("offset", 0) > size:
+        # state 없음/깨짐/로그가 줄어듦 -> 처음부터 다시
+        shutil.rmtree(_rollup_dir(plan_id), ignore_errors=True)
+        state = _empty_state()
+    try:
+        return _replay(plan_id, state, size)
+    except _CorruptRollup:
+        shutil.rmtree(_rollup_dir(plan_id), ignore_errors=True)
+        return _replay(plan_id, _empty_state(), size)
+
+def sync_rollups(plan_id: int) -> Dict[str, Any]:
+    """
+    롤업을 metrics.jsonl 과 맞춘 뒤 state 를 반환.
+    로그가 state.offset 보다 길면 남은 라인만 반영하고, state 가 없거나 맞지 않으면 전체 재구성.
+    """
+    if not has_plan_dir(plan_id):
+        return _empty_state()
+    with _plan_lock(plan_id):
+        return _sync_rollups_locked(plan_id)
+
+def rebuild_rollups(plan_id: int) -> Dict[str, Any]:
+    """롤업을 지우고 metrics.jsonl 전체로 다시 만든다."""
+    with _plan_lock(plan_id):
+        shutil.rmtree(_rollup_dir(plan_id), ignore_errors=True)
+        return _sync_rollups_locked(plan_id)
+
+def rollup_partitions(plan_id: int, bucket: str) -> list:
+    """bucket 의 파티션 키 목록(시간순)."""
+    d = os.path.join(_rollup_dir(plan_id), bucket)
+    if not os.path.isdir(d):
+        return []
+    return sorted(n[:-5] for n in os.listdir(d) if n.endswith(".json"))
+
+def read_rollup_partition(plan_id: int, bucket: str, part: str) -> Dict[str, Any]:
+    """파티션 하나의 {"<버킷 시작 ISO>": {키: [...]}}. 없으면 빈 dict, 깨져 있으면 전체 재구성 후 다시 읽음."""
+    path = _rollup_part_path(plan_id, bucket, part)
+    data = _read_json(path)
+    if data is None and not os.path.exists(path):
+        return {}
+    if not _valid_partition(data):
+        rebuild_rollups(plan_id)
+        data = _read_json(path)
+    return data["buckets"] if _valid_partition(data) else {}
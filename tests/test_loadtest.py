@@ -0,0 +1,46 @@
+import os
+
+from app.loadtest.harness import ROUTES, format_report, run_load_test
+
+
+def test_run_load_test_smoke(tmp_path):
+    result = run_load_test(
+        duration=0.5,
+        concurrency=2,
+        plans=2,
+        members=2,
+        burst=2,
+        weights={"analyze": 1.0, "report_text": 1.0, "llm_text": 1.0, "timeseries": 1.0},
+        seed=1,
+        baseline=0.2,
+        data_root=str(tmp_path),
+        ollama={"latency_ms": 5, "jitter_ms": 0, "failure_rate": 1.0, "seed": 1},
+        budgets={"error_rate": 0.0},
+    )
+
+    for key in ("elapsed_s", "total_requests", "total_errors", "throughput_rps", "routes",
+                "event_loop_lag", "baseline_loop_lag", "exceptions", "ollama", "breaches", "config"):
+        assert key in result
+    for lag in (result["event_loop_lag"], result["baseline_loop_lag"]):
+        assert lag["samples"] > 0
+        assert set(lag) == {"samples", "p50_ms", "p95_ms", "p99_ms", "max_ms"}
+
+    analyze = result["routes"][ROUTES["analyze"]]
+    assert analyze["requests"] > 0
+    assert analyze["status"] == {"200": analyze["requests"]}
+
+    # 앱 프로세스가 가짜 Ollama 로 붙었고(OLLAMA_URL), 주입한 실패가 그대로 500 으로 보였는지
+    llm = result["routes"][ROUTES["llm_text"]]
+    assert result["ollama"]["calls"] == llm["requests"] > 0
+    assert result["ollama"]["injected_failures"] == result["ollama"]["calls"]
+    assert llm["status"] == {"500": llm["requests"]}
+    assert sum(result["exceptions"].values()) == llm["requests"]
+
+    assert [b["budget"] for b in result["breaches"]] == ["error_rate"]
+
+    # 앱 프로세스가 DATA_ROOT 로 넘긴 디렉터리에 기록했는지
+    assert os.path.exists(tmp_path / "plan_1" / "metrics.jsonl")
+    assert os.path.isdir(tmp_path / "plan_1" / "rollup")
+
+    text = format_report(result)
+    assert "500:" in text and "BUDGET EXCEEDED" in text
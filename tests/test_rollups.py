@@ -0,0 +1,231 @@
+import json
+import os
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import storage
+from app.main import create_app
+from app.services.timeseries_service import compute_timeseries
+
+T0 = datetime(2025, 12, 30, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def data_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "DATA_ROOT", str(tmp_path))
+    return tmp_path
+
+
+def _rec(rng, plan_id=1, minutes=60 * 24 * 20):
+    dt = T0 + timedelta(minutes=rng.randint(0, minutes), seconds=rng.randint(0, 59))
+    if rng.random() < 0.3:
+        created_at = dt.astimezone(timezone(timedelta(hours=9))).isoformat()
+    else:
+        created_at = dt.isoformat().replace("+00:00", "Z")
+    return {
+        "plan_id": plan_id,
+        "member_id": rng.randint(1, 3),
+        "distance_km": round(rng.uniform(0.5, 10.0), 2),
+        "travel_minutes": rng.randint(1, 60),
+        "late_minutes": rng.choice([None, 0, rng.randint(1, 20)]),
+        "wait_minutes": None,
+        "created_at": created_at,
+    }
+
+
+def _fill(n, seed=1, plan_id=1):
+    rng = random.Random(seed)
+    for _ in range(n):
+        storage.append_metrics_line(plan_id, _rec(rng, plan_id))
+
+
+def _expected(plan_id, bucket, since, until, member_id, tz_offset_minutes):
+    """iter_metrics 로 원본을 전부 읽어 같은 시계열을 다시 계산."""
+    off = timedelta(minutes=tz_offset_minutes)
+
+    def floor(dt):
+        return storage.bucket_start(storage.to_utc(dt) + off, bucket) - off
+
+    groups = {}
+    for r in storage.iter_metrics(plan_id):
+        dt = storage.to_utc(r.get("created_at"))
+        if dt is None or (member_id is not None and r["member_id"] != member_id):
+            continue
+        g = groups.setdefault(floor(dt), [0, 0.0, 0])
+        g[0] += 1
+        g[1] += r.get("distance_km") or 0.0
+        g[2] += r.get("late_minutes") or 0
+
+    lo = floor(since) if since else None
+    points, cum = [], [0, 0.0, 0]
+    for t in sorted(groups):
+        if until and t > until:
+            break
+        cum = [a + b for a, b in zip(cum, groups[t])]
+        if lo and t < lo:
+            continue
+        points.append((t, groups[t][0], round(groups[t][1], 2), groups[t][2],
+                       cum[0], round(cum[1], 2), cum[2]))
+    return points
+
+
+def _actual(series):
+    return [(datetime.fromisoformat(p["t"]), p["records"], p["distance_km"], p["late_minutes"],
+             p["cum_records"], p["cum_distance_km"], p["cum_late_minutes"])
+            for p in series["points"]]
+
+
+def _assert_matches(plan_id, bucket, since=None, until=None, member_id=None, tz_offset_minutes=0):
+    series = compute_timeseries(plan_id, bucket, since=since, until=until,
+                                member_id=member_id, tz_offset_minutes=tz_offset_minutes)
+    expected = _expected(plan_id, bucket, since, until, member_id, tz_offset_minutes)
+    actual = _actual(series)
+    assert [p[0] for p in actual] == [p[0] for p in expected]
+    assert [p[1:] for p in actual] == pytest.approx([p[1:] for p in expected])
+    assert series["total_records"] == sum(p[1] for p in expected)
+    return series
+
+
+def test_timeseries_matches_recomputation(data_root):
+    _fill(1500)
+    rng = random.Random(2)
+    for _ in range(150):
+        bucket = rng.choice(["minute", "hour", "day"])
+        since = T0 + timedelta(minutes=rng.randint(-60, 60 * 24 * 20)) if rng.random() < 0.8 else None
+        until = (since or T0) + timedelta(minutes=rng.randint(0, 60 * 24 * 4)) if rng.random() < 0.8 else None
+        _assert_matches(1, bucket, since, until,
+                        member_id=rng.choice([None, 1, 2, 3]),
+                        tz_offset_minutes=rng.choice([0, 540, -300]))
+
+
+def test_all_time_and_range_totals(data_root):
+    _fill(50)
+    series = compute_timeseries(1, "hour", until=T0 - timedelta(days=1))
+    assert series["points"] == []
+    assert series["total_records"] == 0
+    assert series["all_time_records"] == 50
+
+
+def test_kst_day_buckets_split_at_local_midnight(data_root):
+    for ts in ("2026-10-19T14:59:00Z", "2026-10-19T15:00:00Z"):
+        storage.append_metrics_line(1, {"plan_id": 1, "member_id": 1, "created_at": ts})
+    utc = compute_timeseries(1, "day")
+    kst = compute_timeseries(1, "day", tz_offset_minutes=540)
+    assert [p["t"] for p in utc["points"]] == ["2026-10-19T00:00:00+00:00"]
+    assert [p["t"] for p in kst["points"]] == ["2026-10-19T00:00:00+09:00", "2026-10-20T00:00:00+09:00"]
+    with pytest.raises(ValueError):
+        compute_timeseries(1, "day", tz_offset_minutes=330)
+
+
+def test_replays_lines_written_past_watermark(data_root):
+    _fill(20)
+    assert compute_timeseries(1, "day")["all_time_records"] == 20
+    rng = random.Random(9)
+    with open(storage.metrics_file_path(1), "a", encoding="utf-8") as f:
+        for _ in range(3):
+            f.write(json.dumps(_rec(rng)) + "\n")
+    assert compute_timeseries(1, "day")["all_time_records"] == 23
+    _assert_matches(1, "minute")
+
+
+def test_stale_state_does_not_double_count(data_root):
+    _fill(20)
+    state_path = os.path.join(str(data_root), "plan_1", "rollup", "state.json")
+    with open(state_path, encoding="utf-8") as f:
+        stale = f.read()
+    _fill(10, seed=5)
+    # state 기록 직전에 죽은 상황: 파티션은 새 라인을 반영했지만 state 는 예전 offset
+    with open(state_path, "w", encoding="utf-8") as f:
+        f.write(stale)
+    for bucket in storage.ROLLUP_BUCKETS:
+        assert _assert_matches(1, bucket)["all_time_records"] == 30
+
+
+def test_truncated_log_rebuilds(data_root):
+    _fill(30)
+    path = storage.metrics_file_path(1)
+    with open(path, encoding="utf-8") as f:
+        lines = f.readlines()
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(lines[:12])
+    for bucket in storage.ROLLUP_BUCKETS:
+        assert _assert_matches(1, bucket)["all_time_records"] == 12
+
+
+def test_partial_trailing_line_waits_until_complete(data_root):
+    _fill(5)
+    line = json.dumps({"plan_id": 1, "member_id": 1, "created_at": "2026-01-01T00:00:00Z"})
+    with open(storage.metrics_file_path(1), "a", encoding="utf-8") as f:
+        f.write(line[:20])
+    assert compute_timeseries(1, "day")["all_time_records"] == 5
+    with open(storage.metrics_file_path(1), "a", encoding="utf-8") as f:
+        f.write(line[20:] + "\n")
+    assert compute_timeseries(1, "day")["all_time_records"] == 6
+
+
+def test_corrupt_partition_triggers_full_rebuild(data_root):
+    _fill(200)
+    minute_dir = os.path.join(str(data_root), "plan_1", "rollup", "minute")
+    victim = sorted(os.listdir(minute_dir))[0]
+    with open(os.path.join(minute_dir, victim), "w", encoding="utf-8") as f:
+        f.write("{not json")
+    # 새 라인이 깨진 파티션으로 들어가도 이력이 유실되지 않아야 함
+    part_start = datetime.strptime(victim[:-5], "%Y-%m-%dT%H").replace(tzinfo=timezone.utc)
+    storage.append_metrics_line(1, {"plan_id": 1, "member_id": 1, "distance_km": 1.0,
+                                    "created_at": part_start.isoformat()})
+    _assert_matches(1, "minute")
+
+    # 새 라인 없이 읽기만 해도 깨진 파티션을 감지
+    with open(os.path.join(minute_dir, victim), "w", encoding="utf-8") as f:
+        f.write("[]")
+    _assert_matches(1, "minute")
+
+
+def test_unparseable_created_at_is_counted(data_root):
+    _fill(5)
+    with open(storage.metrics_file_path(1), "a", encoding="utf-8") as f:
+        f.write(json.dumps({"plan_id": 1, "member_id": 7, "created_at": "garbage"}) + "\n")
+    assert compute_timeseries(1, "day")["skipped_records"] == 1
+    member = compute_timeseries(1, "day", member_id=7)
+    assert member["skipped_records"] == 1 and member["all_time_records"] == 0
+
+
+def test_concurrent_appends(data_root):
+    def writer(seed):
+        rng = random.Random(seed)
+        for _ in range(25):
+            storage.append_metrics_line(1, _rec(rng, minutes=120))
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for bucket in storage.ROLLUP_BUCKETS:
+        assert _assert_matches(1, bucket)["all_time_records"] == 200
+
+
+def test_timeseries_endpoint(data_root):
+    client = TestClient(create_app())
+    assert client.get("/metrics/report/1/timeseries").status_code == 404
+    assert client.post("/metrics/analyze", json={"plan_id": 1, "member_id": 1, "distance_km": 2.5,
+                                                  "created_at": "2026-10-19T15:30:00Z"}).status_code == 200
+
+    r = client.get("/metrics/report/1/timeseries", params={"bucket": "day", "tz_offset_minutes": 540})
+    assert r.status_code == 200
+    assert r.json()["data"]["points"][0]["t"] == "2026-10-20T00:00:00+09:00"
+    assert client.get("/metrics/report/1/timeseries", params={"bucket": "week"}).status_code == 422
+    assert client.get("/metrics/report/1/timeseries", params={"tz_offset_minutes": 330}).status_code == 422
+    assert client.get("/metrics/report/1/timeseries", params={"member_id": 9}).status_code == 409
+
+    # created_at 을 못 읽은 기록만 있는 플랜은 409 가 아니라 skipped_records 로 알려준다
+    storage.ensure_plan_dir(2)
+    with open(storage.metrics_file_path(2), "w", encoding="utf-8") as f:
+        f.write(json.dumps({"plan_id": 2, "member_id": 1, "created_at": "garbage"}) + "\n")
+    r = client.get("/metrics/report/2/timeseries")
+    assert r.status_code == 200
+    assert r.json()["data"]["skipped_records"] == 1 and r.json()["data"]["points"] == []